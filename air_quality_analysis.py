@@ -0,0 +1,9 @@
+from core import analyze_air_quality_data
+
+
+if __name__ == '__main__':
+    # Define your source file
+    source_excel_file = 'Oxygen_AQI_Dataset.xlsx'
+
+    # Run the analysis and save the plots (no Google Sheets export)
+    analyze_air_quality_data(source_excel_file)
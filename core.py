@@ -0,0 +1,512 @@
+"""
+Air quality analysis shared by the command-line scripts: loading the sensor
+data, the statistical summary and the plots.
+"""
+from datetime import datetime, timedelta
+import pandas as pd
+import numpy as np
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Prefer the Rust-based calamine reader when it is installed (pandas >= 2.2);
+# it avoids openpyxl's per-cell Python objects. Fall back to openpyxl otherwise.
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = 'openpyxl'
+
+# pyarrow is only needed for the Parquet copy of the dataset (see load_dataset)
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Numba is optional; without it the summary falls back to plain NumPy reductions
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Column dtypes of the loaded dataset
+SENSOR_DTYPES = {'O2_Percentage': 'float32', 'AQI': 'float32'}
+
+# Most points drawn per time-series line; more are not visible in the saved PNGs
+PLOT_MAX_POINTS = 2000
+
+# Default resolution of the saved plots (see the dpi argument of analyze_air_quality_data)
+TIME_SERIES_DPI = 150
+HISTOGRAM_DPI = 120
+
+# Row labels of the statistical summary, in the same order as DataFrame.describe()
+SUMMARY_LABELS = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+if njit is not None:
+    # The explicit signature compiles the kernel when the module is imported, and
+    # cache=True stores the machine code in __pycache__ so later runs skip LLVM entirely.
+    # fastmath leaves out the 'nnan'/'ninf' flags, so the NaN checks are not optimised away
+    @njit('Tuple((float64[:, ::1], float64[::1]))(float32[::1], float32[::1])', cache=True,
+          boundscheck=False, fastmath={'reassoc', 'contract', 'arcp', 'nsz'})
+    def fused_stats(o2, aqi):
+        """
+        Reads both columns once and accumulates everything the summary needs.
+
+        NaNs are skipped per column, as describe() does, so a gap in one column
+        does not affect the other. The cross-moment for the correlation only uses
+        rows where both values are present.
+
+        Returns:
+            tuple: A (2, 5) array with one row per column (O2 first) holding
+            (count, sum, sum of squares, min, max), and the paired-row moments
+            (n, sum_o2, sum_aqi, sum_o2², sum_aqi², sum_o2*aqi).
+        """
+        per_column = np.zeros((2, 5))
+        per_column[:, 3] = np.inf
+        per_column[:, 4] = -np.inf
+        paired = np.zeros(6)
+        for i in range(o2.shape[0]):
+            o = np.float64(o2[i])
+            a = np.float64(aqi[i])
+            o_valid = not np.isnan(o)
+            a_valid = not np.isnan(a)
+            if o_valid:
+                per_column[0, 0] += 1.0
+                per_column[0, 1] += o
+                per_column[0, 2] += o * o
+                per_column[0, 3] = min(per_column[0, 3], o)
+                per_column[0, 4] = max(per_column[0, 4], o)
+            if a_valid:
+                per_column[1, 0] += 1.0
+                per_column[1, 1] += a
+                per_column[1, 2] += a * a
+                per_column[1, 3] = min(per_column[1, 3], a)
+                per_column[1, 4] = max(per_column[1, 4], a)
+            if o_valid and a_valid:
+                paired[0] += 1.0
+                paired[1] += o
+                paired[2] += a
+                paired[3] += o * o
+                paired[4] += a * a
+                paired[5] += o * a
+        return per_column, paired
+
+def compute_statistics(df):
+    """
+    Computes the describe()-style summary for the O2_Percentage and AQI columns.
+
+    Uses the fused Numba kernel when Numba is installed, NumPy reductions otherwise.
+
+    Args:
+        df (pd.DataFrame): Data with the 'O2_Percentage' and 'AQI' columns, in that order.
+
+    Returns:
+        tuple: An (8, 2) array in SUMMARY_LABELS order, and the AQI/O2 correlation.
+    """
+    vals = df.to_numpy(dtype=np.float32, copy=False)
+    # The quartiles need a sort, so they always come from NumPy
+    q25, q50, q75 = np.nanpercentile(vals, [25, 50, 75], axis=0)
+
+    if njit is not None:
+        # The compiled signature takes C-contiguous float32 arrays only
+        per_column, paired = fused_stats(
+            np.ascontiguousarray(df['O2_Percentage'].to_numpy(), dtype=np.float32),
+            np.ascontiguousarray(df['AQI'].to_numpy(), dtype=np.float32),
+        )
+        counts, sums, sums_sq, mins, maxs = per_column.T
+        n, so, sa, so2, sa2, soa = paired
+        # Empty columns (or no complete rows) give NaN, like the NumPy path
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+            stds = np.sqrt(np.maximum(sums_sq - sums * means, 0) / (counts - 1))
+            # Centred sums of squares / cross products over the paired rows
+            ss_o = so2 - so * so / n
+            ss_a = sa2 - sa * sa / n
+            sp_oa = soa - so * sa / n
+            correlation = sp_oa / np.sqrt(ss_o * ss_a)
+        mins = np.where(counts > 0, mins, np.nan)
+        maxs = np.where(counts > 0, maxs, np.nan)
+    else:
+        counts = np.count_nonzero(~np.isnan(vals), axis=0)
+        means = np.nanmean(vals, axis=0)
+        stds = np.nanstd(vals, axis=0, ddof=1)
+        mins = np.nanmin(vals, axis=0)
+        maxs = np.nanmax(vals, axis=0)
+        # Pairwise-complete rows only, matching the kernel (and pandas' .corr)
+        paired = vals[~np.isnan(vals).any(axis=1)]
+        correlation = np.corrcoef(paired, rowvar=False)[0, 1]
+
+    return np.vstack([counts, means, stds, mins, q25, q50, q75, maxs]), correlation
+
+def resample_to_minutes(df, start_time, seconds_per_interval):
+    """
+    Averages evenly spaced readings into 1-minute buckets.
+
+    Gives the same result as df.resample('min').mean(), but with one np.bincount
+    per column instead of a groupby.
+
+    Args:
+        df (pd.DataFrame): Readings taken every `seconds_per_interval` seconds.
+        start_time (datetime): Time of the first reading (on a whole minute).
+        seconds_per_interval (int): Spacing between readings, in seconds.
+    """
+    minute = np.arange(len(df)) * seconds_per_interval // 60
+    columns = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        valid = ~np.isnan(values)
+        sums = np.bincount(minute, weights=np.where(valid, values, 0))
+        counts = np.bincount(minute, weights=valid)
+        # Minutes without any reading become NaN, as with resample()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            columns[col] = sums / counts
+    index = pd.DatetimeIndex(np.datetime64(start_time, 'm') + np.arange(minute[-1] + 1, dtype='timedelta64[m]'))
+    return pd.DataFrame(columns, index=index)
+
+def lttb_indices(y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling of an evenly spaced series.
+
+    Keeps the first and last points and, from each bucket in between, the point
+    forming the largest triangle with the previously kept point and the mean of
+    the next bucket, so peaks and dips survive the thinning.
+
+    Args:
+        y (np.ndarray): The series values.
+        n_out (int): Number of points to keep.
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points.
+    """
+    n = y.shape[0]
+    # Checked here rather than in the kernel, so a series that needs no thinning
+    # never triggers Numba's compilation
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    return _lttb(y, n_out)
+
+def _lttb(y, n_out):
+    """
+    LTTB kernel behind lttb_indices(); expects 3 <= n_out < len(y).
+    """
+    n = y.shape[0]
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0] = 0
+    kept[n_out - 1] = n - 1
+    bucket_size = (n - 2) / (n_out - 2)
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        # Average point of the next bucket
+        cx = (end + next_end - 1) / 2
+        cy = y[end:next_end].mean()
+
+        xs = np.arange(start, end)
+        areas = np.abs((a - cx) * (y[start:end] - y[a]) - (a - xs) * (cy - y[a]))
+        a = start + np.argmax(areas)
+        kept[i + 1] = a
+    return kept
+
+if njit is not None:
+    _lttb = njit(cache=True)(_lttb)
+
+def grid_step(values, max_decimals=3):
+    """
+    Finds the resolution the readings were recorded at (1, 0.1, 0.01, ...).
+
+    Checks whether every value is a whole number of steps, which takes a linear
+    pass per candidate step instead of sorting the data with np.unique.
+
+    Args:
+        values (np.ndarray): The readings, without NaNs.
+        max_decimals (int): Finest resolution to try, in decimal places.
+
+    Returns:
+        float or None: The step, or None if the readings are not on such a grid.
+    """
+    def on_grid(x, decimals):
+        scaled = x * 10.0 ** decimals
+        return np.all(np.abs(scaled - np.round(scaled)) < 1e-3)
+
+    # Screen each resolution on a small sample and only check the full data for the
+    # ones that pass; if the full check fails, carry on with the next finer step
+    sample = values[:1024]
+    for decimals in range(max_decimals + 1):
+        if on_grid(sample, decimals) and on_grid(values, decimals):
+            return 10.0 ** -decimals
+    return None
+
+def plot_histogram(values, color, bins=64):
+    """
+    Draws a histogram with a smoothed density line on the current axes.
+
+    Replaces sns.histplot(..., kde=True): the smooth line is the bin counts
+    blurred with a small Gaussian kernel, so its cost depends on the number of
+    bins rather than on fitting a KDE to every reading.
+
+    Args:
+        values (np.ndarray): The readings to plot.
+        color (str): Colour of the bars and the line.
+        bins (int): Number of histogram bins.
+    """
+    import matplotlib.pyplot as plt
+
+    values = values[~np.isnan(values)]
+    step = grid_step(values)
+    partial_levels = 0
+    if step is not None and values.size:
+        lo, hi = values.min(), values.max()
+        n_levels = round((hi - lo) / step) + 1
+        if 1 < n_levels <= 4096:
+            # Readings sit on a fixed grid (whole AQI points, 0.01% O2). Make every bin
+            # cover the same number of grid steps so the bars don't alternate in height
+            per_bin = int(np.ceil(n_levels / bins))
+            n_bins = int(np.ceil(n_levels / per_bin))
+            bins = lo - step / 2 + step * per_bin * np.arange(n_bins + 1)
+            # The last bin may hold fewer levels; draw it only as wide as they are
+            bins[-1] = hi + step / 2
+            partial_levels = n_levels % per_bin
+    counts, edges = np.histogram(values, bins=bins)
+    plt.stairs(counts, edges, fill=True, color=color, alpha=0.6)
+
+    centres = (edges[:-1] + edges[1:]) / 2
+    density = counts.astype(float)
+    if partial_levels:
+        # Scale the narrow last bin up to a full bin's worth of levels so it doesn't
+        # drag the smoothed line down, and leave it out of the line itself
+        density[-1] *= per_bin / partial_levels
+
+    kernel = np.exp(-0.5 * np.linspace(-3, 3, 9) ** 2)
+    # Pad with the edge counts so the line doesn't dip towards zero at both ends
+    padded = np.pad(density, kernel.size // 2, mode='edge')
+    smoothed = np.convolve(padded, kernel / kernel.sum(), mode='valid')
+    if partial_levels:
+        centres, smoothed = centres[:-1], smoothed[:-1]
+    plt.plot(centres, smoothed, color=color, linewidth=2, rasterized=True)
+
+def render_time_series(aqi_times, aqi, o2_times, o2, path, dpi):
+    """
+    Plots AQI and oxygen concentration against time, one above the other on a
+    shared time axis, and saves them as a single image.
+
+    Kept at module level (and fed plain arrays) so it can run in a worker process.
+
+    Args:
+        aqi_times (np.ndarray): datetime64 timestamps of the AQI points.
+        aqi (np.ndarray): AQI readings at those times.
+        o2_times (np.ndarray): datetime64 timestamps of the oxygen points.
+        o2 (np.ndarray): Oxygen concentration readings at those times.
+        path (str): Where to save the image.
+        dpi (int): Resolution of the saved image.
+    """
+    # Plotting libraries are slow to import, so only load them when drawing
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+    import seaborn as sns
+
+    sns.set_theme(style="whitegrid")
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(16, 10), sharex=True)
+
+    sns.lineplot(x=aqi_times, y=aqi, ax=ax1, color='tab:blue', linewidth=2.5, rasterized=True)
+    ax1.set_title('Air Quality Index (AQI) Over Time (1-Minute Averages)', fontsize=16, weight='bold')
+    ax1.set_ylabel('Air Quality Index (AQI)', fontsize=12)
+
+    sns.lineplot(x=o2_times, y=o2, ax=ax2, color='tab:red', linewidth=2.5, rasterized=True)
+    ax2.set_title('Oxygen Concentration Over Time (1-Minute Averages)', fontsize=16, weight='bold')
+    ax2.set_ylabel('Oxygen Concentration (%)', fontsize=12)
+
+    # With sharex only the bottom axes shows the time labels
+    ax2.set_xlabel('Time', fontsize=12)
+    ax2.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
+    plt.setp(ax2.get_xticklabels(), rotation=45)
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi)
+    plt.close(fig)
+
+def render_distributions(aqi, o2, path, dpi):
+    """
+    Plots the AQI and O2 histograms side by side and saves them as an image.
+
+    Kept at module level (and fed plain arrays) so it can run in a worker process.
+
+    Args:
+        aqi (np.ndarray): AQI readings.
+        o2 (np.ndarray): Oxygen concentration readings.
+        path (str): Where to save the image.
+        dpi (int): Resolution of the saved image.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.set_theme(style="whitegrid")
+    fig = plt.figure(figsize=(16, 6))
+    plt.suptitle('Distribution of Sensor Values', fontsize=18, weight='bold')
+    
+    plt.subplot(1, 2, 1) #1x2 grids of plots and this is first one (AQI)
+    plot_histogram(aqi, color='salmon')
+    plt.title('AQI Distribution', fontsize=14)
+    plt.xlabel('Air Quality Index')
+    plt.ylabel('Frequency')
+    
+    plt.subplot(1, 2, 2)
+    plot_histogram(o2, color='skyblue')
+    plt.title('Oxygen Concentration Distribution', fontsize=14)
+    plt.xlabel('Oxygen Concentration (%)')
+    plt.ylabel('Frequency')
+    
+    #creating an image and saving it
+    plt.tight_layout(rect=[0, 0, 1, 0.96])
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+
+def read_excel_openpyxl(file_path):
+    """
+    Reads the first two columns of the first sheet with openpyxl in read-only mode.
+
+    Used when calamine is not installed. Streaming the raw cell values straight
+    into a float32 array skips the per-cell conversion and row lists that
+    pd.read_excel builds on top of openpyxl.
+
+    Args:
+        file_path (str): Path to the Excel file.
+    """
+    import openpyxl
+
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        # The first sheet, as pd.read_excel reads by default (not the active one)
+        rows = wb.worksheets[0].iter_rows(min_row=2, max_col=2, values_only=True)
+        values = np.fromiter(
+            (np.nan if v is None else v for row in rows for v in row), dtype=np.float32
+        ).reshape(-1, 2)
+    finally:
+        # Read-only workbooks keep the file open until closed
+        wb.close()
+    # Formatted but empty cells below the data show up as blank rows; drop them
+    # like pandas does, as the row count sets the spacing of the time index
+    filled = np.flatnonzero(~np.isnan(values).all(axis=1))
+    return pd.DataFrame(values[:filled[-1] + 1] if filled.size else values[:0])
+
+def load_dataset(file_path):
+    """
+    Loads the sensor data from an Excel file.
+
+    The first read also writes a Parquet copy next to the Excel file; later runs
+    load that copy instead, as long as it is newer than the Excel file.
+
+    Args:
+        file_path (str): Path to the Excel file.
+    """
+    cache_path = os.path.splitext(file_path)[0] + '.parquet'
+    if HAS_PYARROW and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(file_path):
+        # Caches written before the float32 change hold float64 columns
+        return pd.read_parquet(cache_path, engine='pyarrow').astype(SENSOR_DTYPES, copy=False)
+
+    # Only the first two (numeric) columns are needed. Sensor readings are small
+    # numbers, so float32 is plenty and halves the memory every later pass reads
+    if EXCEL_ENGINE == 'calamine':
+        df = pd.read_excel(file_path, engine='calamine', header=0, usecols=[0, 1], dtype=np.float32)
+    else:
+        df = read_excel_openpyxl(file_path)
+    #Columns from the excel sheet (same for consistency)
+    df.columns = ['O2_Percentage', 'AQI']
+
+    if HAS_PYARROW:
+        try:
+            df.to_parquet(cache_path, engine='pyarrow', compression='zstd', index=False)
+        except OSError as e:
+            # The cache is only an optimisation, so carry on without it
+            print(f"Warning: Could not write the Parquet cache '{cache_path}': {e}")
+    return df
+
+def analyze_air_quality_data(file_path, dpi=None, plots=True):
+    """
+    Analyzes air purifier data from an Excel file.
+
+    This function performs the following steps:
+    1. Loads the data from the specified Excel file.
+    2. Dynamically creates a datetime index based on the number of records.
+    3. Calculates and prints a detailed statistical summary with interpretation.
+    4. Visualizes the data with time-series plots and histograms, saving them as image files.
+
+    Args:
+        file_path (str): Path to the Excel file.
+        dpi (int, optional): Resolution of the saved plots, e.g. 300 for print quality.
+            Defaults to TIME_SERIES_DPI for the time series and HISTOGRAM_DPI for the histograms.
+        plots (bool): Whether to run step 4. Skip it when only the summary is needed.
+    """
+    print("--- Starting Air Quality Data Analysis ---")
+
+    try:
+        df = load_dataset(file_path)
+        print(f"Successfully loaded data from '{file_path}'.")
+    except FileNotFoundError:
+        print(f"Warning: File '{file_path}' not found. Generating sample data.")
+
+    start_time = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    time_intervals = len(df)
+    
+    if time_intervals <= 1440:
+        # If we have 1440 or fewer points, assume they are minutes
+        minutes_per_interval = max(1, 1440 // time_intervals)
+        seconds_per_interval = minutes_per_interval * 60
+        offsets = np.arange(time_intervals, dtype='timedelta64[m]') * minutes_per_interval
+        df.index = pd.DatetimeIndex(np.datetime64(start_time, 'm') + offsets)
+    else:
+        # If we have more than 1440 points, assume they are seconds
+        seconds_per_interval = max(1, 86400 // time_intervals)
+        offsets = np.arange(time_intervals, dtype='timedelta64[s]') * seconds_per_interval
+        df.index = pd.DatetimeIndex(np.datetime64(start_time, 's') + offsets)
+    
+    # --- Step 1: Statistical Analysis ---
+    print("\n--- Statistical Summary ---")
+    stats, correlation = compute_statistics(df)
+    counts, means, stds, mins, q25, q50, q75, maxs = stats
+    """
+        Same metrics as describe: the count (number of data points), mean, standard deviation,
+        minimum and maximum values, 25%, 50%,75% Quartiles (precentiles)
+    """
+    print("The table below shows the key statistical metrics for your data:")
+    # Formatted straight from the arrays; pandas' table formatter is not needed for 16 numbers
+    print(f"{'':8s}" + ''.join(f"{col:>16s}" for col in df.columns))
+    print('\n'.join(f"{label:8s}{o2:16.6f}{aqi:16.6f}" for label, (o2, aqi) in zip(SUMMARY_LABELS, stats)))
+    print("\nInterpretation:")
+    #Columns are indexed by position: 0 is O2_Percentage, 1 is AQI
+    print(f"- Mean AQI: {means[1]:.2f}. This is the average pollution level.")
+    print(f"- Std Dev AQI: {stds[1]:.2f}. This shows how much the AQI fluctuated. A high value means many spikes.")
+    print(f"- Max AQI: {maxs[1]:.2f}. This was the worst air quality moment.")
+    print(f"- Mean O2: {means[0]:.2f}%. Normal range is roughly 20.9%.")
+    print(f"- Correlation AQI/O2: {correlation:.2f}. A negative value means oxygen drops as pollution rises.")
+
+    # --- Visualizations ---
+    if plots:
+        print("\n--- Generating Visualizations ---")
+        df_resampled = resample_to_minutes(df, start_time, seconds_per_interval)
+        print("Note: Resampling data to 1-minute averages for cleaner time-series plots.")
+
+        # Thin the lines here so the workers only receive the points they draw
+        times = df_resampled.index.to_numpy()
+        aqi = df_resampled['AQI'].to_numpy()
+        o2 = df_resampled['O2_Percentage'].to_numpy()
+        aqi_kept = lttb_indices(aqi, PLOT_MAX_POINTS)
+        o2_kept = lttb_indices(o2, PLOT_MAX_POINTS)
+
+        # Each figure is rendered and saved in its own process so they are built in parallel
+        jobs = [
+            ('time-series plot', 'time_series.png', render_time_series,
+             (times[aqi_kept], aqi[aqi_kept], times[o2_kept], o2[o2_kept], 'time_series.png', dpi or TIME_SERIES_DPI)),
+            ('distributions plot', 'distributions_plot.png', render_distributions,
+             (df['AQI'].to_numpy(), df['O2_Percentage'].to_numpy(), 'distributions_plot.png', dpi or HISTOGRAM_DPI)),
+        ]
+        with ProcessPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = [(name, path, executor.submit(fn, *args)) for name, path, fn, args in jobs]
+            for name, path, future in futures:
+                future.result()
+                print(f"Saved the {name} as '{path}'")
+
+    print("\n--- Analysis Complete ---")
+    
+    # Returned as a DataFrame for the callers, e.g. the Google Sheets export
+    return pd.DataFrame(stats, index=SUMMARY_LABELS, columns=df.columns)